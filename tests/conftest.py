@@ -0,0 +1,37 @@
+"""
+Shared pytest fixtures for trackio-mcp tests.
+"""
+
+from unittest.mock import Mock
+
+import pytest
+
+
+@pytest.fixture(scope="session")
+def patched_gradio():
+    """Import gradio and apply trackio-mcp patches once per session."""
+    gr = pytest.importorskip("gradio")
+    from trackio_mcp.monkey_patch import patch_trackio
+
+    patch_trackio()
+    return gr
+
+
+@pytest.fixture
+def mock_sqlite_storage(monkeypatch):
+    """Replace trackio's SQLiteStorage with a mock holding one small project."""
+    sqlite_storage = pytest.importorskip("trackio.sqlite_storage")
+
+    mock = Mock()
+    mock.get_projects.return_value = ["test-project"]
+    mock.get_runs.return_value = ["run-1", "run-2"]
+    mock.get_metrics.return_value = [
+        {"step": 0, "timestamp": "2025-01-01T00:00:00", "loss": 1.0, "accuracy": 0.5},
+        {"step": 1, "timestamp": "2025-01-01T00:00:01", "loss": 0.5, "accuracy": 0.75},
+    ]
+    monkeypatch.setattr(sqlite_storage, "SQLiteStorage", mock)
+
+    from trackio_mcp.tools import _clear_metrics_cache
+    _clear_metrics_cache()
+    yield mock
+    _clear_metrics_cache()
@@ -1,137 +1,450 @@
 """
-Simple tests for the simplified direct monkey patching approach.
-No complex state management, no threading concerns.
+Tests for trackio-mcp patching, MCP tools and the CLI.
+
+Patching tests restore the module globals and ``sys.meta_path`` they touch,
+and import-order behaviour is checked in fresh interpreters.
 """
 
 import pytest
 import os
 import re
+import subprocess
+import sys
 from unittest.mock import Mock, patch
 
+trackio_mcp = pytest.importorskip("trackio_mcp")
+
+from trackio_mcp import monkey_patch  # noqa: E402
+from trackio_mcp.cli import main  # noqa: E402
+from trackio_mcp.monkey_patch import _patch_gradio, patch_trackio  # noqa: E402
+from trackio_mcp.tools import register_trackio_tools, trackio_tool  # noqa: E402
+
+# Building gr.Blocks leaves an asyncio event loop that gradio never closes
+pytestmark = pytest.mark.filterwarnings("ignore:unclosed event loop:ResourceWarning")
+
 
 def test_import_order():
     """Test that importing trackio_mcp enables MCP by default."""
-    import trackio_mcp
-    
     # Check that MCP is enabled by default (not disabled)
     mcp_disabled = os.getenv("TRACKIO_DISABLE_MCP", "false")
-    assert mcp_disabled.lower() not in ("true", "1", "yes")
+    assert mcp_disabled.strip().lower() not in trackio_mcp._TRUTHY
 
 
-def test_gradio_patching():
+def test_gradio_patching(patched_gradio, monkeypatch):
     """Test that gradio gets patched correctly."""
-    try:
-        import gradio as gr
-        from trackio_mcp.monkey_patch import _patch_gradio
-        
-        # Remove any existing patch marker
-        if hasattr(gr.Blocks.launch, '_mcp_patched'):
-            delattr(gr.Blocks.launch, '_mcp_patched')
-        
-        # Store original for comparison
-        original = gr.Blocks.launch
-        
-        # Apply patch
-        _patch_gradio()
-        
-        # Verify it was patched
-        assert hasattr(gr.Blocks.launch, '_mcp_patched')
-        assert gr.Blocks.launch != original
-        
-        # Test that it adds MCP defaults
-        mock_self = Mock()
-        mock_self.local_url = "http://localhost:7860"
-        
-        # Call the patched method (should not raise errors)
-        gr.Blocks.launch(mock_self, quiet=True)
-        
-    except ImportError:
-        pytest.skip("Gradio not available")
-
-
-def test_multiple_patches_safe():
+    gr = patched_gradio
+    monkeypatch.setattr(monkey_patch, "MCP_PATCH_APPLIED", False)
+
+    # Remove any existing patch marker
+    if hasattr(gr.Blocks.launch, '_mcp_patched'):
+        delattr(gr.Blocks.launch, '_mcp_patched')
+    
+    # Store original for comparison
+    original = gr.Blocks.launch
+    
+    # Apply patch
+    _patch_gradio()
+    
+    # Verify it was patched
+    assert hasattr(gr.Blocks.launch, '_mcp_patched')
+    assert monkey_patch.MCP_PATCH_APPLIED is True
+    assert gr.Blocks.launch != original
+    
+    # Test that it adds MCP defaults
+    mock_self = Mock()
+    mock_self.local_url = "http://localhost:7860"
+    
+    # Call the patched method (should not raise errors)
+    gr.Blocks.launch(mock_self, quiet=True)
+
+
+def test_multiple_patches_safe(patched_gradio):
     """Test that applying patch multiple times is safe."""
-    try:
-        import gradio as gr
-        from trackio_mcp.monkey_patch import _patch_gradio
-        
-        # Apply patch multiple times
-        _patch_gradio()
-        _patch_gradio()
-        _patch_gradio()
-        
-        # Should only be patched once (idempotent)
-        assert hasattr(gr.Blocks.launch, '_mcp_patched')
-        
-    except ImportError:
-        pytest.skip("Gradio not available")
-
-
-def test_env_var_disable():
-    """Test that MCP can be disabled via environment variable."""
-    with patch.dict(os.environ, {"TRACKIO_DISABLE_MCP": "true"}):
-        from trackio_mcp.monkey_patch import patch_trackio
-        
-        # Should not raise any errors when disabled
-        patch_trackio()
-
-
-def test_main_patch_function():
-    """Test the main patch_trackio function."""
-    from trackio_mcp.monkey_patch import patch_trackio
+    gr = patched_gradio
+
+    patched_launch = gr.Blocks.launch
+
+    # Apply patch multiple times
+    _patch_gradio()
+    _patch_gradio()
+    _patch_gradio()
     
-    # Should work without errors
+    # Should only be patched once (idempotent)
+    assert hasattr(gr.Blocks.launch, '_mcp_patched')
+    assert gr.Blocks.launch is patched_launch
+
+
+@pytest.mark.parametrize(
+    "user_kwargs, expected",
+    [
+        ({}, {"mcp_server": True, "show_api": True}),
+        ({"mcp_server": False}, {"mcp_server": False, "show_api": True}),
+    ],
+    ids=["defaults", "explicit-override"],
+)
+def test_patched_launch_kwargs(patched_gradio, monkeypatch, user_kwargs, expected):
+    """Test that the patched launch injects MCP defaults without overriding callers."""
+    gr = patched_gradio
+    monkeypatch.setattr(monkey_patch, "MCP_PATCH_APPLIED", False)
+    mock_launch = Mock(spec=[])
+
+    with patch.object(gr.Blocks, "launch", mock_launch):
+        _patch_gradio()
+        gr.Blocks.launch(Mock(local_url=None), quiet=True, **user_kwargs)
+
+    kwargs = mock_launch.call_args.kwargs
+    assert kwargs == {"quiet": True, **expected}
+
+
+def test_patch_trackio_respects_disabled_flag(monkeypatch):
+    """Test that patch_trackio does nothing when MCP is disabled."""
+    monkeypatch.setattr(monkey_patch, "_MCP_ENABLED", False)
+    monkeypatch.setattr(monkey_patch, "_PATCHED", False)
+    monkeypatch.setattr(sys, "meta_path", list(sys.meta_path))
+    mock_patch_gradio = Mock()
+    monkeypatch.setattr(monkey_patch, "_patch_gradio", mock_patch_gradio)
+
     patch_trackio()
 
+    mock_patch_gradio.assert_not_called()
+    assert monkey_patch._PATCHED is False
+
+
+def test_env_var_disable_fresh_interpreter():
+    """Test that TRACKIO_DISABLE_MCP is honoured at import in a clean process."""
+    code = (
+        "import sys, trackio_mcp\n"
+        "assert not trackio_mcp._MCP_ENABLED\n"
+        "assert 'gradio' not in sys.modules\n"
+    )
+    subprocess.run(
+        [sys.executable, "-c", code],
+        env={**os.environ, "TRACKIO_DISABLE_MCP": "true"},
+        check=True,
+        timeout=30,
+    )
+
+
+def test_gradio_patched_on_first_import():
+    """Test that gradio is patched when imported after trackio_mcp, not before."""
+    code = (
+        "import sys, trackio_mcp, trackio_mcp.tools\n"
+        "assert 'gradio' not in sys.modules\n"
+        "assert 'trackio' not in sys.modules\n"
+        "import gradio as gr\n"
+        "from trackio_mcp import monkey_patch\n"
+        "assert monkey_patch.MCP_PATCH_APPLIED\n"
+        "assert gr.Blocks.launch._mcp_patched\n"
+        "assert gr.__loader__ is gr.__spec__.loader\n"
+        "assert not isinstance(gr.__loader__, monkey_patch._PatchingLoader)\n"
+        "assert 'exec_module' not in vars(gr.__loader__)\n"
+    )
+    env = {k: v for k, v in os.environ.items() if k != "TRACKIO_DISABLE_MCP"}
+    subprocess.run([sys.executable, "-c", code], env=env, check=True, timeout=60)
+
+
+def test_gradio_patched_after_find_spec_probe():
+    """Test that probing for gradio with find_spec does not cancel the patch."""
+    code = (
+        "import importlib.util, sys, trackio_mcp\n"
+        "assert importlib.util.find_spec('gradio') is not None\n"
+        "assert 'gradio' not in sys.modules\n"
+        "import gradio as gr\n"
+        "from trackio_mcp import monkey_patch\n"
+        "assert monkey_patch.MCP_PATCH_APPLIED\n"
+        "assert gr.Blocks.launch._mcp_patched\n"
+    )
+    env = {k: v for k, v in os.environ.items() if k != "TRACKIO_DISABLE_MCP"}
+    subprocess.run([sys.executable, "-c", code], env=env, check=True, timeout=60)
+
+
+def test_failed_patch_does_not_break_import():
+    """Test that an error while patching never surfaces from `import gradio`."""
+    code = (
+        "import trackio_mcp\n"
+        "import gradio\n"
+    )
+    env = {k: v for k, v in os.environ.items() if k != "TRACKIO_DISABLE_MCP"}
+    # The patch announcement cannot be encoded as ASCII, so patching raises
+    env["PYTHONIOENCODING"] = "ascii"
+    subprocess.run([sys.executable, "-c", code], env=env, check=True, timeout=60)
+
+
+def test_patch_trackio_runs_once(patched_gradio):
+    """Test that repeated patch_trackio calls short-circuit after the first."""
+    assert monkey_patch._PATCHED is True
+
+    with patch.object(monkey_patch, "_patch_gradio") as mock_patch_gradio:
+        monkey_patch.patch_trackio()
+        mock_patch_gradio.assert_not_called()
+
+
+def test_monkey_patch_thread_safety(patched_gradio, monkeypatch):
+    """Test that concurrent first calls to patch_trackio patch exactly once."""
+    import threading
+
+    monkeypatch.setattr(monkey_patch, "_PATCHED", False)
+    # patch_trackio may install a post-import finder holding these mocks
+    monkeypatch.setattr(sys, "meta_path", list(sys.meta_path))
+    monkeypatch.setattr(monkey_patch, "_patch_trackio_ui", Mock())
+    mock_patch_gradio = Mock()
+    monkeypatch.setattr(monkey_patch, "_patch_gradio", mock_patch_gradio)
+
+    barrier = threading.Barrier(8)
+
+    def worker():
+        barrier.wait()
+        monkey_patch.patch_trackio()
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    mock_patch_gradio.assert_called_once_with()
+    assert monkey_patch._PATCHED is True
+
 
 def test_trackio_tools_functionality():
     """Test that MCP tools work correctly."""
-    try:
-        from trackio_mcp.tools import trackio_tool
-        
-        # Test decorator works
-        @trackio_tool
-        def test_func():
-            return {"success": True, "data": "test"}
-        
-        result = test_func()
-        assert result["success"] is True
-        assert result["data"] == "test"
-        
-        # Test error handling
-        @trackio_tool
-        def failing_func():
-            raise ValueError("Test error")
-        
-        error_result = failing_func()
-        assert error_result["success"] is False
-        assert "Invalid input" in error_result["error"]
-        
-    except ImportError:
-        pytest.skip("Required dependencies not available")
-
-
-def test_cli_commands():
+    # Test decorator works
+    @trackio_tool
+    def test_func():
+        return {"success": True, "data": "test"}
+    
+    result = test_func()
+    assert result["success"] is True
+    assert result["data"] == "test"
+    
+    # Test error handling
+    @trackio_tool
+    def failing_func():
+        raise ValueError("Test error")
+    
+    error_result = failing_func()
+    assert error_result["success"] is False
+    assert "Invalid input" in error_result["error"]
+
+
+
+def test_trackio_tool_logs_traceback(caplog):
+    """Test that unexpected tool errors are logged with a traceback, not returned."""
+    @trackio_tool
+    def broken_func():
+        raise RuntimeError("boom")
+
+    result = broken_func()
+    assert result == {"success": False, "error": "Internal server error"}
+    assert "boom" in caplog.text
+    assert caplog.records[-1].exc_info is not None
+
+
+def test_mcp_tools_functionality(mock_sqlite_storage, monkeypatch):
+    """Test that registered MCP tools return structured results."""
+    # Keep every call inside one cache window
+    monkeypatch.setattr("trackio_mcp.tools._METRICS_CACHE_TTL", 10**9)
+    monkeypatch.setattr("trackio.ui.get_available_metrics", lambda project, runs: ["loss"])
+    tools = register_trackio_tools()
+    assert tools is not None
+    fns = {f.name: f.fn for f in tools.fns.values() if f.name == f.api_name}
+
+    projects = fns["get_projects"]()
+    assert projects == {"success": True, "projects": ["test-project"], "count": 1}
+
+    runs = fns["filter_runs"]("test-project", "RUN-1")
+    assert runs["runs"] == ["run-1"]
+    assert runs["total_runs"] == 2
+
+    summary = fns["get_project_summary"]("test-project")
+    assert summary["metrics"] == ["accuracy", "loss"]
+    assert summary["run_stats"]["run-1"] == {"metric_count": 2, "steps": 2}
+
+    assert fns["get_runs"]("")["success"] is False
+
+    for runs in ('["run-1", "run-2"]', "run-1, run-2,", ""):
+        result = fns["get_available_metrics"]("test-project", runs)
+        assert result["runs"] == ["run-1", "run-2"]
+        assert result["metrics"] == ["loss"]
+
+    # Metrics reads are shared across tools until the cache is cleared
+    fns["get_run_metrics"]("test-project", "run-1")
+    assert mock_sqlite_storage.get_metrics.call_count == 2
+    assert fns["clear_cache"]() == {"success": True}
+    fns["get_run_metrics"]("test-project", "run-1")
+    assert mock_sqlite_storage.get_metrics.call_count == 3
+
+
+def test_metrics_cache_bounded(mock_sqlite_storage, monkeypatch):
+    """Test that expired metrics are refreshed in place and the cache stays bounded."""
+    from types import SimpleNamespace
+    from trackio_mcp import tools
+
+    clock = SimpleNamespace(now=0.0)
+    monkeypatch.setattr(tools, "time", SimpleNamespace(monotonic=lambda: clock.now))
+
+    # Crossing many TTL windows keeps one entry per run, not one per window
+    for _ in range(5):
+        tools._get_metrics("test-project", "run-1")
+        clock.now += tools._METRICS_CACHE_TTL
+    assert len(tools._metrics_cache) == 1
+    assert mock_sqlite_storage.get_metrics.call_count == 5
+
+    # Callers get copies, so one tool cannot corrupt another's view
+    tools._get_metrics("test-project", "run-1")[0]["loss"] = -1
+    assert tools._get_metrics("test-project", "run-1")[0]["loss"] == 1.0
+
+    monkeypatch.setattr(tools, "_METRICS_CACHE_SIZE", 2)
+    for run in ("run-2", "run-3", "run-4"):
+        tools._get_metrics("test-project", run)
+    assert list(tools._metrics_cache) == [("test-project", "run-3"), ("test-project", "run-4")]
+
+    # Expired rows are dropped on the next insert, not kept until the cap
+    monkeypatch.setattr(tools, "_METRICS_CACHE_SIZE", 256)
+    clock.now += tools._METRICS_CACHE_TTL
+    tools._get_metrics("test-project", "run-5")
+    assert list(tools._metrics_cache) == [("test-project", "run-5")]
+
+
+def test_project_summary_mixed_metric_types(mock_sqlite_storage):
+    """Test that a metric numeric in one run survives text values in another."""
+    metrics_by_run = {
+        "run-1": [{"step": 0, "loss": 1.0}, {"step": 1, "loss": 0.5}],
+        "run-2": [{"step": 0, "loss": "nan?"}, {"step": 0, "note": "retry"}],
+    }
+    mock_sqlite_storage.get_metrics.side_effect = lambda project, run: metrics_by_run[run]
+    tools = register_trackio_tools(include_ui=False)
+    fns = {f.name: f.fn for f in tools.fns.values()}
+
+    summary = fns["get_project_summary"]("test-project")
+    assert summary["metrics"] == ["loss"]
+    assert summary["run_stats"] == {
+        "run-1": {"metric_count": 2, "steps": 2},
+        "run-2": {"metric_count": 2, "steps": 1},
+    }
+
+
+def test_available_metrics_pandas_fallback(mock_sqlite_storage, monkeypatch):
+    """Test that get_available_metrics falls back to pandas without trackio's helper."""
+    import trackio.ui
+
+    monkeypatch.delattr(trackio.ui, "get_available_metrics", raising=False)
+    tools = register_trackio_tools(include_ui=False)
+    fns = {f.name: f.fn for f in tools.fns.values()}
+
+    result = fns["get_available_metrics"]("test-project", "run-1,run-2")
+    assert result["runs"] == ["run-1", "run-2"]
+    assert result["metrics"] == ["accuracy", "loss"]
+
+
+def test_register_tools_without_ui(mock_sqlite_storage):
+    """Test that the MCP-only interface registers tools but no UI handlers."""
+    tools = register_trackio_tools(include_ui=False)
+    assert tools is not None
+
+    api_names = {f.api_name for f in tools.fns.values()}
+    assert {"get_projects", "get_project_summary", "clear_cache"} <= api_names
+    assert all(f.name == f.api_name for f in tools.fns.values())
+
+
+def test_cli_commands(tmp_path, monkeypatch):
     """Test CLI functionality."""
-    try:
-        from trackio_mcp.cli import main
-        
-        # Test status command
-        result = main(["status"])
-        assert result in [0, 1]
-        
-        # Test help
-        result = main([])
-        assert result == 1
-        
-    except ImportError:
-        pytest.skip("CLI dependencies not available")
+    # Keep the status cache out of the real ~/.cache
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+
+    # Test status command
+    result = main(["status"])
+    assert result in [0, 1]
+    
+    # Test help
+    result = main([])
+    assert result == 1
+
+
+def test_cli_status_fast_path():
+    """Test that plain `status` skips argparse construction."""
+    with patch("trackio_mcp.cli._show_status", return_value=0) as mock_status, \
+            patch("argparse.ArgumentParser") as mock_parser:
+        assert main(["status"]) == 0
+
+    mock_status.assert_called_once_with()
+    mock_parser.assert_not_called()
+
+
+def test_status_project_summary_cached(tmp_path, monkeypatch, mock_sqlite_storage):
+    """Test that the status project summary is served from the disk cache."""
+    from trackio_mcp.cli import _cached_project_summary
+
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    monkeypatch.setattr("trackio_mcp.cli._trackio_dir", lambda: tmp_path / "trackio")
+    (tmp_path / "trackio").mkdir()
+
+    first = _cached_project_summary()
+    second = _cached_project_summary()
+
+    assert first["count"] == 1
+    assert second["projects"] == [["test-project", 2]]
+    mock_sqlite_storage.get_projects.assert_called_once()
+    assert (tmp_path / "cache" / "trackio-mcp" / "status.json").exists()
+
+    # A cache built for another trackio directory is not reused
+    other_dir = tmp_path / "other-trackio"
+    other_dir.mkdir()
+    monkeypatch.setattr("trackio_mcp.cli._trackio_dir", lambda: other_dir)
+    third = _cached_project_summary()
+    assert third["trackio_dir"] == str(other_dir)
+    assert mock_sqlite_storage.get_projects.call_count == 2
+
+
+def test_status_skips_trackio_without_data_dir(tmp_path, monkeypatch, mock_sqlite_storage):
+    """Test that status reports no projects without touching trackio storage."""
+    from trackio_mcp.cli import _cached_project_summary
+
+    monkeypatch.delenv("TRACKIO_DATASET_ID", raising=False)
+    monkeypatch.setattr("trackio_mcp.cli._trackio_dir", lambda: tmp_path / "missing")
+
+    summary = _cached_project_summary()
+
+    assert summary["count"] == 0
+    mock_sqlite_storage.get_projects.assert_not_called()
+
+    # The full status command must not import trackio or gradio either
+    code = (
+        "import sys\n"
+        "from trackio_mcp.cli import main\n"
+        "assert main(['status']) == 0\n"
+        "assert 'trackio' not in sys.modules\n"
+        "assert 'gradio' not in sys.modules\n"
+    )
+    env = {
+        k: v for k, v in os.environ.items()
+        if k not in ("TRACKIO_DATASET_ID", "HF_HOME")
+    }
+    env.update(HOME=str(tmp_path), XDG_CACHE_HOME=str(tmp_path / "cache"))
+    subprocess.run([sys.executable, "-c", code], env=env, check=True, timeout=30)
+
+
+def test_cli_test_reuses_session():
+    """Test that the CLI test command reuses one HTTP session."""
+    with patch("requests.Session") as mock_session_cls, \
+            patch("trackio_mcp.cli._test_tools_only", return_value=0):
+        session = mock_session_cls.return_value
+        session.get.return_value.status_code = 200
+        session.get.return_value.json.return_value = {"paths": {}}
+
+        assert main(["test", "--url", "http://localhost:7860/"]) == 0
+
+    mock_session_cls.assert_called_once()
+    assert [c.args[0] for c in session.get.call_args_list] == [
+        "http://localhost:7860/",
+        "http://localhost:7860/gradio_api/mcp/sse",
+        "http://localhost:7860/gradio_api/mcp/schema",
+    ]
+    session.close.assert_called_once()
 
 
 def test_import_trackio_mcp():
     """Test importing trackio_mcp applies patches automatically."""
-    import trackio_mcp
-    
     # Should have version attribute
     assert hasattr(trackio_mcp, '__version__')
     # Should be a valid semantic version (x.y.z format)
@@ -139,61 +452,11 @@ def test_import_trackio_mcp():
     assert re.match(version_pattern, trackio_mcp.__version__), f"Invalid version format: {trackio_mcp.__version__}"
 
 
-def test_mcp_enabled_by_default():
-    """Test that MCP is enabled by default when importing."""
-    # Clear any existing environment variable
-    with patch.dict(os.environ, {}, clear=True):
-        from trackio_mcp.monkey_patch import patch_trackio
-        
-        # Should enable MCP by default (no env var set)
-        patch_trackio()
-        
-        # Should work without errors
-
-
-def test_mcp_disable_override():
-    """Test that setting TRACKIO_DISABLE_MCP=true disables MCP."""
-    with patch.dict(os.environ, {"TRACKIO_DISABLE_MCP": "true"}):
-        from trackio_mcp.monkey_patch import patch_trackio
-        
-        # Should not enable MCP when explicitly disabled
-        patch_trackio()
-        
-        # Should work without errors
-
-
-if __name__ == "__main__":
-    # Run tests manually
-    import sys
-    
-    tests = [
-        test_import_order,
-        test_gradio_patching,
-        test_multiple_patches_safe, 
-        test_env_var_disable,
-        test_main_patch_function,
-        test_trackio_tools_functionality,
-        test_cli_commands,
-        test_import_trackio_mcp,
-        test_mcp_enabled_by_default,
-        test_mcp_disable_override,
-    ]
-    
-    passed = failed = skipped = 0
-    
-    for test in tests:
-        try:
-            print(f"Running {test.__name__}...")
-            test()
-            print("  ✅ PASSED")
-            passed += 1
-        except Exception as e:
-            if "skip" in str(e).lower():
-                print("  ⚠️  SKIPPED")
-                skipped += 1
-            else:
-                print(f"  ❌ FAILED: {e}")
-                failed += 1
-    
-    print(f"\nResults: {passed} passed, {failed} failed, {skipped} skipped")
-    sys.exit(0 if failed == 0 else 1)
\ No newline at end of file
+def test_lazy_public_api():
+    """Test that public helpers resolve lazily from the package namespace."""
+    assert trackio_mcp.patch_trackio is patch_trackio
+    assert trackio_mcp.register_trackio_tools is register_trackio_tools
+
+    with pytest.raises(AttributeError):
+        _ = trackio_mcp.does_not_exist
+
@@ -1,22 +1,45 @@
 """
 trackio-mcp: MCP server support for trackio experiment tracking
 
-Simple, direct monkey patching approach. Import this before trackio to 
+Simple, direct monkey patching approach. Import this before trackio to
 automatically enable MCP server functionality.
 """
 
+import os
+
 __version__ = "0.2.0"
 
-# Apply patches immediately on import - simple and direct
-try:
-    from .monkey_patch import patch_trackio
-    from .tools import register_trackio_tools
-    
-    __all__ = ["patch_trackio", "register_trackio_tools"]
-    
-    # Auto-patch when imported
-    patch_trackio()
-    
-except Exception:
-    # Fail gracefully if dependencies missing
-    __all__ = []
+__all__ = ["patch_trackio", "register_trackio_tools"]
+
+_TRUTHY = frozenset({"true", "1", "yes", "on"})
+
+# Resolved once at import; MCP is enabled unless explicitly disabled
+_MCP_ENABLED: bool = (
+    os.getenv("TRACKIO_DISABLE_MCP", "false").strip().lower() not in _TRUTHY
+)
+
+
+def __getattr__(name: str):
+    """Lazily resolve public helpers so importing the package stays cheap."""
+    if name == "patch_trackio":
+        from .monkey_patch import patch_trackio
+        return patch_trackio
+    if name == "register_trackio_tools":
+        from .tools import register_trackio_tools
+        return register_trackio_tools
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
+
+
+# Auto-patch when imported, unless MCP is explicitly disabled
+if _MCP_ENABLED:
+    try:
+        from .monkey_patch import patch_trackio as _patch_trackio
+
+        _patch_trackio()
+    except Exception:
+        # Fail gracefully if dependencies missing
+        pass
@@ -2,14 +2,22 @@
 Command-line interface for trackio-mcp.
 """
 
-import argparse
 import sys
+from functools import cache
 from typing import Optional
 
 
 def main(argv: Optional[list] = None) -> int:
     """Main CLI entry point."""
+    if argv is None:
+        argv = sys.argv[1:]
     
+    # Fast path: plain `status` needs no argument parsing
+    if list(argv) == ["status"]:
+        return _show_status()
+    
+    import argparse
+
     parser = argparse.ArgumentParser(
         prog="trackio-mcp",
         description="MCP server support for trackio experiment tracking"
@@ -69,7 +77,9 @@ def _run_server(args) -> int:
 def _show_status() -> int:
     """Show current status and configuration."""
     import os
-    
+
+    from . import _MCP_ENABLED
+
     print("trackio-mcp Status")
     print("=" * 50)
     
@@ -78,47 +88,41 @@ def _show_status() -> int:
     mcp_disabled = os.getenv("TRACKIO_DISABLE_MCP", "false")
     
     print(f"  TRACKIO_DISABLE_MCP: {mcp_disabled}")
-    print(f"  MCP Status: {'Disabled' if mcp_disabled.lower() in ('true', '1', 'yes') else 'Enabled (default)'}")
+    print(f"  MCP Status: {'Enabled (default)' if _MCP_ENABLED else 'Disabled'}")
     
-    # Check imports
+    # Check installed versions from package metadata so status does not pay
+    # for importing trackio / gradio
+    from importlib.metadata import PackageNotFoundError, version
+
+    from . import __version__
+    from .monkey_patch import MCP_PATCH_APPLIED
+
     print("\nPackage Status:")
-    try:
-        import trackio_mcp
-        print(f"  trackio-mcp: {trackio_mcp.__version__}")
-    except ImportError as e:
-        print(f"  trackio-mcp: {e}")
-    
-    try:
-        import trackio
-        print(f"  trackio: {trackio.__version__}")
-    except ImportError as e:
-        print(f"  trackio: {e}")
-        
-    try:
-        import gradio as gr
-        print(f"  gradio: {gr.__version__}")
-        
-        # Check MCP patches
-        if hasattr(gr.Blocks.launch, '_mcp_patched'):
-            print("  MCP patches: Applied")
-        else:
-            print("  MCP patches: Not applied")
-            
-    except ImportError as e:
-        print(f"  gradio: {e}")
+    print(f"  trackio-mcp: {__version__}")
+    for package in ("trackio", "gradio"):
+        try:
+            print(f"  {package}: {version(package)}")
+        except PackageNotFoundError:
+            print(f"  {package}: not installed")
+    if MCP_PATCH_APPLIED:
+        patch_status = "Applied"
+    elif _MCP_ENABLED and "gradio" not in sys.modules:
+        patch_status = "Pending (applied when gradio is imported)"
+    else:
+        patch_status = "Not applied"
+    print(f"  MCP patches: {patch_status}")
     
     # Check trackio projects
     print("\nTrackio Projects:")
     try:
-        from trackio.sqlite_storage import SQLiteStorage
-        projects = SQLiteStorage.get_projects()
-        if projects:
-            print(f"  Found {len(projects)} projects:")
-            for project in projects[:5]:
-                runs = SQLiteStorage.get_runs(project)
-                print(f"    • {project} ({len(runs)} runs)")
-            if len(projects) > 5:
-                print(f"    ... and {len(projects) - 5} more")
+        summary = _cached_project_summary()
+        count = summary["count"]
+        if count:
+            print(f"  Found {count} projects:")
+            for project, run_count in summary["projects"]:
+                print(f"    • {project} ({run_count} runs)")
+            if count > 5:
+                print(f"    ... and {count - 5} more")
         else:
             print("  No projects found")
     except Exception as e:
@@ -132,11 +136,95 @@ def _show_status() -> int:
     return 0
 
 
+@cache
+def _trackio_dir():
+    """Resolve trackio's data directory without importing trackio."""
+    import os
+    from pathlib import Path
+
+    hf_home = os.getenv("HF_HOME") or os.path.join(
+        os.getenv("XDG_CACHE_HOME", os.path.join(Path.home(), ".cache")),
+        "huggingface",
+    )
+    return Path(hf_home).expanduser() / "trackio"
+
+
+def _status_cache_path():
+    """Location of the on-disk cache used by the status command."""
+    import os
+    from pathlib import Path
+
+    cache_home = os.getenv("XDG_CACHE_HOME", os.path.join(Path.home(), ".cache"))
+    return Path(cache_home).expanduser() / "trackio-mcp" / "status.json"
+
+
+def _cached_project_summary(ttl: float = 60) -> dict:
+    """Project count and run counts for the first five projects, cached on disk.
+
+    The cache is reused for up to ``ttl`` seconds unless a trackio database
+    was modified after it was written, or it was built for a different
+    trackio directory or Spaces dataset.
+    """
+    import json
+    import os
+    import time
+
+    cache_path = _status_cache_path()
+    trackio_dir = _trackio_dir()
+    dataset_id = os.getenv("TRACKIO_DATASET_ID")
+
+    # Nothing has been logged here yet (and no Spaces dataset to pull from),
+    # so skip importing trackio just to report zero projects
+    if not trackio_dir.is_dir() and not dataset_id:
+        return {"ts": time.time(), "count": 0, "projects": []}
+
+    try:
+        cached = json.loads(cache_path.read_text())
+        newest = max(
+            [trackio_dir.stat().st_mtime]
+            + [db.stat().st_mtime for db in trackio_dir.glob("*.db")]
+        )
+        if (
+            cached["trackio_dir"] == str(trackio_dir)
+            and cached["dataset_id"] == dataset_id
+            and time.time() - cached["ts"] < ttl
+            and newest <= cached["ts"]
+        ):
+            return cached
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    from trackio.sqlite_storage import SQLiteStorage
+
+    ts = time.time()
+    projects = SQLiteStorage.get_projects()
+    summary = {
+        "ts": ts,
+        "trackio_dir": str(trackio_dir),
+        "dataset_id": dataset_id,
+        "count": len(projects),
+        "projects": [
+            [project, len(SQLiteStorage.get_runs(project))]
+            for project in map(sys.intern, projects[:5])
+        ],
+    }
+
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        cache_path.write_text(json.dumps(summary))
+    except OSError:
+        # Cache is best-effort; status still works without it
+        pass
+
+    return summary
+
+
 def _test_server(args) -> int:
     """Test MCP server functionality."""
     url = args.url or "http://localhost:7860"
-    mcp_url = f"{url.rstrip('/')}/gradio_api/mcp/sse"
-    schema_url = f"{url.rstrip('/')}/gradio_api/mcp/schema"
+    base_url = url.rstrip('/')
+    mcp_url = f"{base_url}/gradio_api/mcp/sse"
+    schema_url = f"{base_url}/gradio_api/mcp/schema"
     
     print(f"Testing MCP server at {url}")
     print("=" * 50)
@@ -145,35 +233,42 @@ def _test_server(args) -> int:
     print("\n1. Testing basic connectivity...")
     try:
         import requests
-        response = requests.get(url, timeout=5)
-        print(f"  Server status: {response.status_code}")
     except ImportError:
         print("  requests not available - skipping HTTP tests")
         return _test_tools_only()
-    except Exception as e:
-        print(f"  Server not reachable: {e}")
-        return 1
-    
-    # Test MCP endpoint
-    print("\n2. Testing MCP endpoint...")
-    try:
-        response = requests.get(mcp_url, timeout=5)
-        print(f"  MCP endpoint status: {response.status_code}")
-    except Exception as e:
-        print(f"  MCP endpoint error: {e}")
-    
-    # Test schema endpoint
-    print("\n3. Testing schema endpoint...")
+
+    # Reuse one keep-alive connection for all endpoint checks
+    session = requests.Session()
     try:
-        response = requests.get(schema_url, timeout=5)
-        if response.status_code == 200:
-            schema = response.json()
-            tools = schema.get("paths", {})
-            print(f"  Schema available with {len(tools)} endpoints")
-        else:
-            print(f"  Schema endpoint status: {response.status_code}")
-    except Exception as e:
-        print(f"  Schema endpoint error: {e}")
+        try:
+            response = session.get(url, timeout=5)
+            print(f"  Server status: {response.status_code}")
+        except Exception as e:
+            print(f"  Server not reachable: {e}")
+            return 1
+        
+        # Test MCP endpoint
+        print("\n2. Testing MCP endpoint...")
+        try:
+            response = session.get(mcp_url, timeout=5)
+            print(f"  MCP endpoint status: {response.status_code}")
+        except Exception as e:
+            print(f"  MCP endpoint error: {e}")
+        
+        # Test schema endpoint
+        print("\n3. Testing schema endpoint...")
+        try:
+            response = session.get(schema_url, timeout=5)
+            if response.status_code == 200:
+                schema = response.json()
+                tools = schema.get("paths", {})
+                print(f"  Schema available with {len(tools)} endpoints")
+            else:
+                print(f"  Schema endpoint status: {response.status_code}")
+        except Exception as e:
+            print(f"  Schema endpoint error: {e}")
+    finally:
+        session.close()
     
     return _test_tools_only()
 
@@ -183,7 +278,7 @@ def _test_tools_only() -> int:
     print("\n4. Testing trackio tools...")
     try:
         from .tools import register_trackio_tools
-        tools = register_trackio_tools()
+        tools = register_trackio_tools(include_ui=False)
         if tools:
             print("  ✓ Trackio MCP tools available")
             return 0
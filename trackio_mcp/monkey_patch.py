@@ -1,31 +1,147 @@
 """
-Ultra-simple direct monkey patching for trackio MCP functionality.
-No import hooks, no threading, no complexity. Just direct patching.
+Direct monkey patching for trackio MCP functionality.
+
+Modules that are already imported are patched immediately. For the rest, a
+meta path hook patches gradio / trackio.ui right after they are first
+imported, so importing trackio_mcp never pulls gradio in itself.
 """
 
-import os
-from functools import wraps
+import sys
+import threading
+from functools import partial, wraps
+from importlib.abc import Loader, MetaPathFinder
+
+from . import _MCP_ENABLED
+
+# Set once patching has run; checked before taking the lock so that only
+# the first-patch window is serialized and later calls stay lock-free
+_PATCHED = False
+_patch_lock = threading.Lock()
+
+# Whether gr.Blocks.launch currently carries the MCP patch
+MCP_PATCH_APPLIED = False
+_trackio_ui_patched = False
 
 
 def patch_trackio() -> None:
     """Apply monkey patches to enable MCP server functionality."""
-    
+    global _PATCHED
+
+    # Fast path: nothing to do once patches are applied
+    if _PATCHED:
+        return
+
     # Check if MCP should be disabled (default: enabled)
-    if os.getenv("TRACKIO_DISABLE_MCP", "false").lower() in ("true", "1", "yes"):
+    if not _MCP_ENABLED:
         return
-    
-    # Simple direct patches
-    _patch_gradio()
-    _patch_trackio_ui()
+
+    with _patch_lock:
+        # Re-check in case another thread patched while we waited
+        if _PATCHED:
+            return
+
+        # Patch modules that are already loaded, defer the rest until import
+        pending = {}
+        for name, patcher in (("gradio", _patch_gradio), ("trackio.ui", _patch_trackio_ui)):
+            if name in sys.modules:
+                patcher()
+            else:
+                pending[name] = patcher
+
+        if pending:
+            sys.meta_path.insert(0, _PostImportPatcher(pending))
+        _PATCHED = True
+
+
+class _PostImportPatcher(MetaPathFinder):
+    """Meta path finder that patches selected modules right after they load.
+
+    It never loads anything itself: for a watched name it looks up the spec
+    with the remaining finders and swaps in a :class:`_PatchingLoader`. A name
+    stays watched until its module has actually been executed, since a bare
+    ``importlib.util.find_spec`` probe does not import anything. Once every
+    watched module has loaded, it removes itself from ``sys.meta_path``.
+    """
+
+    def __init__(self, patchers):
+        self._patchers = dict(patchers)
+
+    def find_spec(self, fullname, path, target=None):
+        if fullname not in self._patchers:
+            return None
+
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+
+        if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+            spec.loader = _PatchingLoader(spec.loader, partial(self._loaded, fullname))
+        return spec
+
+    def _loaded(self, fullname) -> None:
+        """Run and forget the patcher for a module that has just executed."""
+        patcher = self._patchers.pop(fullname, None)
+        if not self._patchers:
+            self._remove()
+        if patcher is not None:
+            patcher()
+
+    def _remove(self) -> None:
+        try:
+            sys.meta_path.remove(self)
+        except ValueError:
+            pass
+
+
+class _PatchingLoader(Loader):
+    """Loader that runs a patcher after the wrapped loader executes a module.
+
+    The real loader is left untouched; anything beyond ``create_module`` and
+    ``exec_module`` (resource readers, ``get_data``, ...) is delegated to it.
+    """
+
+    def __init__(self, loader, patcher):
+        self._loader = loader
+        self._patcher = patcher
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        # Hand the module back to its real loader before running it, so that
+        # nothing keeps a reference to this wrapper after the import
+        module.__loader__ = self._loader
+        if module.__spec__ is not None:
+            module.__spec__.loader = self._loader
+        self._loader.exec_module(module)
+        try:
+            self._patcher()
+        except Exception:
+            # A failed patch must never break the host import
+            pass
 
 
 def _patch_gradio() -> None:
     """Patch Gradio launch method to enable MCP by default."""
+    global MCP_PATCH_APPLIED
+
+    if MCP_PATCH_APPLIED:
+        return
+
     try:
         import gradio as gr
         
         # Skip if already patched
         if hasattr(gr.Blocks.launch, '_mcp_patched'):
+            MCP_PATCH_APPLIED = True
             return
             
         # Store original method
@@ -37,21 +153,22 @@ def _patch_gradio() -> None:
             # Set MCP defaults
             kwargs.setdefault('mcp_server', True)
             kwargs.setdefault('show_api', True)
-                
+            
             # Call original method
             result = original_launch(self, *args, **kwargs)
             
             # Show MCP URL (if not quiet)
-            if (kwargs.get('mcp_server') and 
-                not kwargs.get('quiet') and 
-                hasattr(self, 'local_url') and self.local_url):
-                print(f"🔗 MCP Server: {self.local_url.rstrip('/')}/gradio_api/mcp/sse")
+            if kwargs['mcp_server'] and not kwargs.get('quiet'):
+                local_url = getattr(self, 'local_url', None)
+                if local_url:
+                    print(f"🔗 MCP Server: {local_url.rstrip('/')}/gradio_api/mcp/sse")
                 
             return result
         
         # Apply patch
         gr.Blocks.launch = mcp_enabled_launch
         mcp_enabled_launch._mcp_patched = True
+        MCP_PATCH_APPLIED = True
         print("✅ trackio-mcp: Gradio patched for MCP support")
         
     except ImportError:
@@ -61,15 +178,21 @@ def _patch_gradio() -> None:
 
 def _patch_trackio_ui() -> None:
     """Patch trackio UI demo launch if it exists."""
+    global _trackio_ui_patched
+
+    if _trackio_ui_patched:
+        return
+
     try:
-        import trackio.ui
+        # Bound via sys.modules so this also works while trackio is still importing
+        import trackio.ui as trackio_ui
         
         # Patch demo.launch if it exists
-        if (hasattr(trackio.ui, 'demo') and 
-            hasattr(trackio.ui.demo, 'launch') and
-            not hasattr(trackio.ui.demo.launch, '_mcp_patched')):
-            
-            original_demo_launch = trackio.ui.demo.launch
+        if not (hasattr(trackio_ui, 'demo') and hasattr(trackio_ui.demo, 'launch')):
+            return
+
+        if not hasattr(trackio_ui.demo.launch, '_mcp_patched'):
+            original_demo_launch = trackio_ui.demo.launch
             
             @wraps(original_demo_launch)
             def mcp_demo_launch(*args, **kwargs):
@@ -77,9 +200,11 @@ def _patch_trackio_ui() -> None:
                 kwargs.setdefault('show_api', True)
                 return original_demo_launch(*args, **kwargs)
             
-            trackio.ui.demo.launch = mcp_demo_launch
+            trackio_ui.demo.launch = mcp_demo_launch
             mcp_demo_launch._mcp_patched = True
-            
+
+        _trackio_ui_patched = True
+
     except ImportError:
         # trackio UI not available - that's okay
         pass
\ No newline at end of file
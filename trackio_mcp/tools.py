@@ -2,15 +2,96 @@
 Simplified MCP tools for trackio functionality.
 """
 
-import traceback
+import json
+import sys
+import threading
+import time
 from functools import wraps
-from typing import Any, Dict, List, Optional, Union
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Union
 
-try:
+if TYPE_CHECKING:
     import gradio as gr
-    GRADIO_AVAILABLE = True
-except ImportError:
-    GRADIO_AVAILABLE = False
+
+# Columns trackio adds to every metrics row that are not metrics themselves
+_NON_METRIC_COLUMNS = frozenset(("step", "timestamp"))
+
+_pd = None
+
+
+def _get_pd():
+    """Import pandas on first use instead of at module import."""
+    global _pd
+    if _pd is None:
+        import pandas as pd
+        _pd = pd
+    return _pd
+
+
+# Seconds a cached metrics read stays valid before SQLite is queried again
+_METRICS_CACHE_TTL = 30
+
+
+# Most (project, run) entries kept in the metrics cache at once
+_METRICS_CACHE_SIZE = 256
+
+# (project, run) -> (expires_at, metrics), oldest insertion first
+_metrics_cache: Dict[Tuple[str, str], Tuple[float, List[Dict[str, Any]]]] = {}
+_metrics_cache_lock = threading.Lock()
+
+
+def _get_metrics(project: str, run: str) -> List[Dict[str, Any]]:
+    """Metrics for a run, shared across tools for up to _METRICS_CACHE_TTL seconds.
+
+    Callers get their own copy of the rows, so mutating a result never
+    changes what other tools see.
+    """
+    key = (project, run)
+    now = time.monotonic()
+    with _metrics_cache_lock:
+        entry = _metrics_cache.get(key)
+
+    if entry is None or entry[0] <= now:
+        from trackio.sqlite_storage import SQLiteStorage
+        entry = (now + _METRICS_CACHE_TTL, SQLiteStorage.get_metrics(project, run))
+        with _metrics_cache_lock:
+            # Re-insert so the refreshed entry counts as the newest
+            _metrics_cache.pop(key, None)
+            # Entries share one TTL, so the oldest are the first to expire:
+            # drop expired ones from the front, then any beyond the size cap
+            while _metrics_cache:
+                oldest = next(iter(_metrics_cache))
+                if _metrics_cache[oldest][0] > now and len(_metrics_cache) < _METRICS_CACHE_SIZE:
+                    break
+                del _metrics_cache[oldest]
+            _metrics_cache[key] = entry
+
+    return [dict(row) for row in entry[1]]
+
+
+def _clear_metrics_cache() -> None:
+    """Forget all cached run metrics."""
+    with _metrics_cache_lock:
+        _metrics_cache.clear()
+
+
+def _get_metrics_for_runs(project: str, runs: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+    """Metrics for several runs, read concurrently since SQLite I/O releases the GIL."""
+    if len(runs) <= 1:
+        return {run: _get_metrics(project, run) for run in runs}
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=min(8, len(runs))) as executor:
+        results = executor.map(lambda run: _get_metrics(project, run), runs)
+        return dict(zip(runs, results, strict=True))
+
+
+def _numeric_metric_names(metrics: List[Dict[str, Any]]) -> List[str]:
+    """Names of the numeric metric columns in one run's metrics rows."""
+    if not metrics:
+        return []
+    df = _get_pd().DataFrame(metrics)
+    return [c for c in df.select_dtypes(include="number").columns if c not in _NON_METRIC_COLUMNS]
 
 
 def trackio_tool(func):
@@ -23,7 +104,7 @@ def trackio_tool(func):
             return {"success": False, "error": f"trackio not available: {e}"}
         except (ValueError, KeyError, TypeError) as e:
             return {"success": False, "error": f"Invalid input: {e}"}
-        except Exception as e:
+        except Exception:
             # Log unexpected errors but don't expose internals
             import logging
             logging.exception(f"Unexpected error in {func.__name__}")
@@ -31,25 +112,31 @@ def trackio_tool(func):
     return wrapper
 
 
-def register_trackio_tools() -> Optional[gr.Blocks]:
-    """Register trackio-specific MCP tools as a Gradio interface."""
+def register_trackio_tools(include_ui: bool = True) -> Optional["gr.Blocks"]:
+    """Register trackio-specific MCP tools as a Gradio interface.
+
+    Set ``include_ui=False`` to expose only the MCP/API endpoints and skip
+    building the interactive test UI.
+    """
     
-    if not GRADIO_AVAILABLE:
-        return None
-        
     try:
+        import gradio as gr
         from trackio.sqlite_storage import SQLiteStorage
         from trackio import ui as trackio_ui
     except ImportError:
         return None
 
+    # Optional trackio UI helpers, resolved once rather than on every call
+    ui_get_available_metrics = getattr(trackio_ui, 'get_available_metrics', None)
+    ui_load_run_data = getattr(trackio_ui, 'load_run_data', None)
+
     with gr.Blocks(title="Trackio MCP Tools") as trackio_tools:
         
         @gr.api
         @trackio_tool
         def get_projects() -> Dict[str, Any]:
             """Get list of all trackio projects."""
-            projects = SQLiteStorage.get_projects()
+            projects = [sys.intern(p) for p in SQLiteStorage.get_projects()]
             return {
                 "success": True,
                 "projects": projects,
@@ -63,7 +150,7 @@ def register_trackio_tools() -> Optional[gr.Blocks]:
             if not project:
                 raise ValueError("Project name is required")
                     
-            runs = SQLiteStorage.get_runs(project)
+            runs = [sys.intern(r) for r in SQLiteStorage.get_runs(project)]
             return {
                 "success": True,
                 "project": project,
@@ -79,7 +166,11 @@ def register_trackio_tools() -> Optional[gr.Blocks]:
                 raise ValueError("Project name is required")
                     
             all_runs = SQLiteStorage.get_runs(project)
-            filtered_runs = [r for r in all_runs if filter_text.lower() in r.lower()] if filter_text else all_runs
+            if filter_text:
+                needle = filter_text.lower()
+                filtered_runs = [r for r in all_runs if needle in r.lower()]
+            else:
+                filtered_runs = all_runs
                     
             return {
                 "success": True,
@@ -97,7 +188,7 @@ def register_trackio_tools() -> Optional[gr.Blocks]:
             if not project or not run:
                 raise ValueError("Both project and run names are required")
                     
-            metrics = SQLiteStorage.get_metrics(project, run)
+            metrics = _get_metrics(project, run)
             return {
                 "success": True,
                 "project": project,
@@ -113,33 +204,29 @@ def register_trackio_tools() -> Optional[gr.Blocks]:
             if not project:
                 raise ValueError("Project name is required")
             
-            # Parse runs parameter
+            # Parse runs parameter: a JSON list or comma-separated names
             run_list = []
-            if runs:
-                try:
-                    import json
-                    run_list = json.loads(runs) if isinstance(runs, str) else runs
-                except json.JSONDecodeError:
-                    run_list = [r.strip() for r in runs.split(",")]
+            if isinstance(runs, str):
+                text = runs.strip()
+                if text.startswith("["):
+                    run_list = json.loads(text)
+                else:
+                    run_list = [r.strip() for r in text.split(",") if r.strip()]
+            elif runs:
+                run_list = runs
             
             if not run_list:
                 run_list = SQLiteStorage.get_runs(project)
             
             # Get available metrics
-            if hasattr(trackio_ui, 'get_available_metrics'):
-                available_metrics = trackio_ui.get_available_metrics(project, run_list)
+            if ui_get_available_metrics is not None:
+                available_metrics = ui_get_available_metrics(project, run_list)
             else:
                 # Fallback implementation
                 all_metrics = set()
-                for run in run_list:
-                    metrics = SQLiteStorage.get_metrics(project, run)
-                    if metrics:
-                        import pandas as pd
-                        df = pd.DataFrame(metrics)
-                        numeric_cols = df.select_dtypes(include="number").columns
-                        numeric_cols = [c for c in numeric_cols if c not in ["step", "timestamp"]]
-                        all_metrics.update(numeric_cols)
-                available_metrics = sorted(list(all_metrics))
+                for metrics in _get_metrics_for_runs(project, run_list).values():
+                    all_metrics.update(_numeric_metric_names(metrics))
+                available_metrics = sorted(all_metrics)
             
             return {
                 "success": True,
@@ -157,8 +244,8 @@ def register_trackio_tools() -> Optional[gr.Blocks]:
                 raise ValueError("Both project and run names are required")
             
             # Use trackio's function if available
-            if hasattr(trackio_ui, 'load_run_data'):
-                df = trackio_ui.load_run_data(project, run, smoothing, x_axis)
+            if ui_load_run_data is not None:
+                df = ui_load_run_data(project, run, smoothing, x_axis)
                 if df is not None:
                     # Convert DataFrame to dict - Gradio handles serialization
                     data = df.to_dict('records')
@@ -175,7 +262,7 @@ def register_trackio_tools() -> Optional[gr.Blocks]:
                     raise ValueError("No data found for the specified run")
             else:
                 # Fallback: return raw metrics
-                metrics = SQLiteStorage.get_metrics(project, run)
+                metrics = _get_metrics(project, run)
                 return {
                     "success": True,
                     "project": project,
@@ -204,22 +291,19 @@ def register_trackio_tools() -> Optional[gr.Blocks]:
                 }
             
             # Get metrics for all runs
+            metrics_by_run = _get_metrics_for_runs(project, runs)
+            
+            # Dtypes are inferred per run, so a metric that is numeric in one
+            # run still counts even if another run logged it as text
             all_metrics = set()
             run_stats = {}
-            
             for run in runs:
-                metrics = SQLiteStorage.get_metrics(project, run)
+                metrics = metrics_by_run[run]
                 run_stats[run] = {
                     "metric_count": len(metrics),
-                    "steps": len(set(m.get("step", 0) for m in metrics)) if metrics else 0
+                    "steps": len({m.get("step", 0) for m in metrics})
                 }
-                
-                if metrics:
-                    import pandas as pd
-                    df = pd.DataFrame(metrics)
-                    numeric_cols = df.select_dtypes(include="number").columns
-                    numeric_cols = [c for c in numeric_cols if c not in ["step", "timestamp"]]
-                    all_metrics.update(numeric_cols)
+                all_metrics.update(_numeric_metric_names(metrics))
             
             return {
                 "success": True,
@@ -231,31 +315,39 @@ def register_trackio_tools() -> Optional[gr.Blocks]:
                 "run_stats": run_stats
             }
 
+        @gr.api
+        @trackio_tool
+        def clear_cache() -> Dict[str, Any]:
+            """Clear cached run metrics so the next call reads fresh data."""
+            _clear_metrics_cache()
+            return {"success": True}
+
         # Simplified UI for testing
-        gr.Markdown("# Trackio MCP Tools")
-        gr.Markdown("This interface exposes trackio functionality as MCP tools.")
-        
-        with gr.Tab("Projects"):
-            get_projects_btn = gr.Button("Get Projects")
-            projects_output = gr.JSON(label="Projects")
-            get_projects_btn.click(get_projects, outputs=projects_output)
-            
-        with gr.Tab("Runs"):
-            with gr.Row():
-                project_input = gr.Textbox(label="Project", placeholder="Enter project name")
-                filter_input = gr.Textbox(label="Filter", placeholder="Filter runs (optional)")
-            get_runs_btn = gr.Button("Get Runs")
-            filter_runs_btn = gr.Button("Filter Runs")
-            runs_output = gr.JSON(label="Runs")
-            
-            get_runs_btn.click(get_runs, inputs=project_input, outputs=runs_output)
-            filter_runs_btn.click(filter_runs, inputs=[project_input, filter_input], outputs=runs_output)
-            
-        with gr.Tab("Summary"):
-            summary_project_input = gr.Textbox(label="Project", placeholder="Enter project name")
-            get_summary_btn = gr.Button("Get Project Summary")
-            summary_output = gr.JSON(label="Project Summary")
-            get_summary_btn.click(get_project_summary, inputs=summary_project_input, outputs=summary_output)
+        if include_ui:
+            gr.Markdown("# Trackio MCP Tools")
+            gr.Markdown("This interface exposes trackio functionality as MCP tools.")
+
+            with gr.Tab("Projects"):
+                get_projects_btn = gr.Button("Get Projects")
+                projects_output = gr.JSON(label="Projects")
+                get_projects_btn.click(get_projects, outputs=projects_output)
+
+            with gr.Tab("Runs"):
+                with gr.Row():
+                    project_input = gr.Textbox(label="Project", placeholder="Enter project name")
+                    filter_input = gr.Textbox(label="Filter", placeholder="Filter runs (optional)")
+                get_runs_btn = gr.Button("Get Runs")
+                filter_runs_btn = gr.Button("Filter Runs")
+                runs_output = gr.JSON(label="Runs")
+
+                get_runs_btn.click(get_runs, inputs=project_input, outputs=runs_output)
+                filter_runs_btn.click(filter_runs, inputs=[project_input, filter_input], outputs=runs_output)
+
+            with gr.Tab("Summary"):
+                summary_project_input = gr.Textbox(label="Project", placeholder="Enter project name")
+                get_summary_btn = gr.Button("Get Project Summary")
+                summary_output = gr.JSON(label="Project Summary")
+                get_summary_btn.click(get_project_summary, inputs=summary_project_input, outputs=summary_output)
 
     return trackio_tools
 
@@ -263,7 +355,7 @@ def register_trackio_tools() -> Optional[gr.Blocks]:
 def launch_trackio_mcp_server(port: int = 7861, share: bool = False) -> None:
     """Launch a standalone trackio MCP server."""
     
-    trackio_tools = register_trackio_tools()
+    trackio_tools = register_trackio_tools(include_ui=False)
     if trackio_tools is None:
         print("Failed to create trackio MCP tools interface")
         return